@@ -0,0 +1,77 @@
+# benchmarks/bench_mixer.py
+"""
+Per-frame CPU cost of MixerSource compared to discord.PCMVolumeTransformer.
+
+Run from the project root:
+    python -m benchmarks.bench_mixer
+"""
+
+import time
+import numpy as np
+import discord
+
+from utils.mixer import FRAME_SIZE, MixerSource
+
+FRAMES = 20000  # 400 seconds of audio
+
+
+class NoiseSource(discord.AudioSource):
+    """Endless source returning the same pre-generated PCM frame."""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        samples = rng.integers(-20000, 20000, FRAME_SIZE // 2, dtype=np.int16)
+        self.frame = samples.tobytes()
+
+    def read(self):
+        return self.frame
+
+
+def bench(name, source, setup=None):
+    for _ in range(100):  # Warm up
+        source.read()
+    if setup:
+        setup(source)
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        source.read()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed / FRAMES * 1e6:8.2f} µs/frame")
+
+
+def toggle_volume(source):
+    # Keep the mixer ramping for the whole run
+    original = source.read
+
+    def read():
+        source.fade_to(0.8 if source.volume < 0.8 else 0.2, 1)
+        return original()
+
+    source.read = read
+
+
+def main():
+    print(f"{FRAMES} frames of 20ms, 48kHz stereo\n")
+    bench(
+        "PCMVolumeTransformer (0.5)", discord.PCMVolumeTransformer(NoiseSource(), 0.5)
+    )
+    bench("MixerSource (0.5)", MixerSource(NoiseSource(), volume=0.5))
+    bench("MixerSource (volume ramp)", MixerSource(NoiseSource()), toggle_volume)
+
+    # A crossfade longer than the run keeps the mixer inside the fade
+    song = {"duration": FRAMES}
+    crossfading = MixerSource(
+        NoiseSource(),
+        volume=0.5,
+        duration=FRAMES,
+        crossfade=FRAMES,
+        peek_next=lambda: song,
+        advance=lambda song: True,
+        open_track=lambda song: NoiseSource(),
+    )
+    bench("MixerSource (crossfade)", crossfading)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,15 @@ from discord.ext import commands
 import asyncio
 import logging
 import random
-from utils.ytdl import YTDLSource
+from utils.ytdl import DEFAULT_VOLUME, YTDLSource
+from utils.loudness import LoudnessAnalyzer
+from utils.audio_workers import (
+    AUDIO_WORKER_PROCESSES,
+    AudioWorkerPool,
+    NoWorkersAvailable,
+)
+from utils.governor import ResourceBusy, ResourceGovernor
+from utils.mixer import CROSSFADE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,24 @@ class Music(commands.Cog):
         self.current_song = {}
         self.loop_queue = {}
         self.loop_song = {}
+        self.volumes = {}
+        self.loudness = LoudnessAnalyzer()
+        self.governor = ResourceGovernor()
+        self.audio_workers = AudioWorkerPool() if AUDIO_WORKER_PROCESSES > 0 else None
+
+    async def cog_load(self):
+        await self.loudness.start()
+        if self.audio_workers and CROSSFADE_SECONDS:
+            logger.warning(
+                "CROSSFADE_SECONDS is ignored while AUDIO_WORKER_PROCESSES is set."
+            )
+        if self.audio_workers:
+            await asyncio.to_thread(self.audio_workers.start)
+
+    async def cog_unload(self):
+        await self.loudness.stop()
+        if self.audio_workers:
+            await asyncio.to_thread(self.audio_workers.shutdown)
 
     # --- Helper Methods ---
     def _initialize_guild_state(self, guild_id):
@@ -27,6 +53,7 @@ class Music(commands.Cog):
         self.current_song[guild_id] = None
         self.loop_queue[guild_id] = False
         self.loop_song[guild_id] = False
+        self.volumes[guild_id] = DEFAULT_VOLUME
 
     def _ensure_guild_state_exists(self, guild_id):
         if guild_id not in self.queues:
@@ -42,6 +69,13 @@ class Music(commands.Cog):
         user_channel = ctx.author.voice.channel
         vc = ctx.guild.voice_client
 
+        if vc is None or not vc.is_connected():
+            try:
+                self.governor.acquire_stream(guild_id)
+            except ResourceBusy as e:
+                await ctx.send(f"⏳ {e}")
+                return None
+
         try:
             if vc is None:
                 vc = await user_channel.connect(timeout=30.0)
@@ -56,9 +90,83 @@ class Music(commands.Cog):
             return vc
         except Exception as e:
             logger.error(f"Connection error: {e}")
+            if not ctx.guild.voice_client:
+                self.governor.release_stream(guild_id)
             await ctx.send("❌ Could not connect to voice channel.")
             return None
 
+    def _next_song(self, guild_id, dequeue=True):
+        """
+        Picks the next song, honoring the loop settings.
+        With dequeue=False it only peeks and leaves the queue untouched.
+        """
+        current = self.current_song.get(guild_id)
+        queue = self.queues.get(guild_id)
+        if queue is None:
+            return None
+
+        # Loop Logic
+        if self.loop_song.get(guild_id, False) and current:
+            return current
+        requeue = self.loop_queue.get(guild_id, False) and current
+
+        if queue.empty():
+            # A looped queue of one song comes straight back around
+            return current if requeue else None
+        if not dequeue:
+            return queue._queue[0]
+
+        next_song = queue.get_nowait()
+        queue.task_done()
+        if requeue:
+            queue.put_nowait(current)
+        return next_song
+
+    def _advance(self, ctx, song):
+        """
+        Called by the mixer when it starts crossfading into a preloaded song.
+        Only advances if that song is still the next one.
+        """
+        guild_id = ctx.guild.id
+        if self._next_song(guild_id, dequeue=False) is not song:
+            return False
+
+        self._next_song(guild_id)
+        self.current_song[guild_id] = song
+        embed = self._create_now_playing_embed(song)
+        asyncio.run_coroutine_threadsafe(ctx.send(embed=embed), self.bot.loop)
+        return True
+
+    def _open_track(self, song):
+        gain_db = self.loudness.get_gain(song.get("id"))
+        return YTDLSource.create_pcm_source(song["source"], gain_db)
+
+    def _create_source(self, ctx, song):
+        gain_db = self.loudness.get_gain(song.get("id"))
+        volume = self.volumes.get(ctx.guild.id, DEFAULT_VOLUME)
+        if self.audio_workers:
+            try:
+                return self.audio_workers.create_source(
+                    song["source"], gain_db, volume=volume
+                )
+            except NoWorkersAvailable:
+                logger.warning("No audio workers running, playing in-process.")
+                return YTDLSource.create_source(song["source"], gain_db, volume)
+
+        if not CROSSFADE_SECONDS:
+            return YTDLSource.create_source(song["source"], gain_db, volume)
+
+        return YTDLSource.create_source(
+            song["source"],
+            gain_db,
+            volume,
+            duration=song.get("duration"),
+            crossfade=CROSSFADE_SECONDS,
+            peek_next=lambda: self._next_song(ctx.guild.id, dequeue=False),
+            advance=lambda song: self._advance(ctx, song),
+            open_track=self._open_track,
+        )
+
     def _play_next(self, ctx):
         """Logic for playing the next song."""
         guild_id = ctx.guild.id
@@ -68,60 +176,55 @@ class Music(commands.Cog):
             asyncio.run_coroutine_threadsafe(self._cleanup(guild_id), self.bot.loop)
             return
 
-        current = self.current_song.get(guild_id)
-        next_song = None
-
-        # Loop Logic
-        if self.loop_song.get(guild_id, False) and current:
-            next_song = current
-        elif self.loop_queue.get(guild_id, False) and current:
-            asyncio.run_coroutine_threadsafe(
-                self.queues[guild_id].put(current), self.bot.loop
-            )
-
-        # Get next from queue if needed
+        next_song = self._next_song(guild_id)
         if not next_song:
-            if not self.queues[guild_id].empty():
-                try:
-                    next_song = self.queues[guild_id].get_nowait()
-                    self.queues[guild_id].task_done()
-                except asyncio.QueueEmpty:
-                    pass
-            else:
-                self.current_song[guild_id] = None
-                return
+            self.current_song[guild_id] = None
+            return
 
         # Play
-        if next_song:
-            try:
-                self.current_song[guild_id] = next_song
+        try:
+            self.current_song[guild_id] = next_song
 
-                # Use the utility to create the source
-                source = YTDLSource.create_source(next_song["source"])
+            # Use the utility to create the source
+            source = self._create_source(ctx, next_song)
 
-                vc.play(source, after=lambda e: self.play_next_after_error(e, ctx))
+            vc.play(source, after=lambda e: self.play_next_after_error(e, ctx))
 
-                embed = self._create_now_playing_embed(next_song)
-                asyncio.run_coroutine_threadsafe(ctx.send(embed=embed), self.bot.loop)
-            except Exception as e:
-                logger.error(f"Playback error: {e}")
-                self._play_next(ctx)
+            embed = self._create_now_playing_embed(next_song)
+            asyncio.run_coroutine_threadsafe(ctx.send(embed=embed), self.bot.loop)
+        except Exception as e:
+            logger.error(f"Playback error: {e}")
+            self._play_next(ctx)
 
     def play_next_after_error(self, error, ctx):
         if error:
             logger.error(f"Playback callback error: {error}")
-        if not self.loop_song.get(ctx.guild.id, False):
-            self.current_song[ctx.guild.id] = None
+        # current_song stays set so _next_song can requeue it for queue loop,
+        # exactly like the mixer's crossfade path does
         self._play_next(ctx)
 
+    async def _leave_if_idle(self, ctx, joined):
+        """
+        Gives back the voice session a rejected command opened, so turned-away
+        requests don't keep holding a MAX_STREAMS slot.
+        """
+        vc = ctx.guild.voice_client
+        queue = self.queues.get(ctx.guild.id)
+        if not joined or not vc or vc.is_playing() or vc.is_paused():
+            return
+        if queue is None or queue.empty():
+            await self._cleanup(ctx.guild.id)
+
     async def _cleanup(self, guild_id):
         guild = self.bot.get_guild(guild_id)
         if guild and guild.voice_client:
             await guild.voice_client.disconnect(force=True)
+        self.governor.release_stream(guild_id)
         self.queues.pop(guild_id, None)
         self.current_song.pop(guild_id, None)
         self.loop_queue.pop(guild_id, None)
         self.loop_song.pop(guild_id, None)
+        self.volumes.pop(guild_id, None)
 
     # --- Embed Helpers ---
     def _create_now_playing_embed(self, song):
@@ -194,20 +297,40 @@ class Music(commands.Cog):
         Plays a song from YouTube (Link or Search).
         Inputs: <url> OR <search terms>
         """
+        joined = ctx.guild.voice_client is None
         vc = await self._ensure_voice_client(ctx)
         if not vc:
             return
 
-        async with ctx.typing():
-            song = await YTDLSource.get_song_info(query, self.bot.loop)
-            if not song:
-                await ctx.send("❌ Could not find song.")
-                return
-            song["requester"] = ctx.author
-
         guild_id = ctx.guild.id
         self._ensure_guild_state_exists(guild_id)
 
+        try:
+            self.governor.check_queue_length(self.queues[guild_id].qsize())
+            async with ctx.typing(), self.governor.extraction(guild_id):
+                song = await YTDLSource.get_song_info(query, self.bot.loop)
+        except ResourceBusy as e:
+            await ctx.send(f"⏳ {e}")
+            await self._leave_if_idle(ctx, joined)
+            return
+
+        if not song:
+            await ctx.send("❌ Could not find song.")
+            await self._leave_if_idle(ctx, joined)
+            return
+        song["requester"] = ctx.author
+
+        # The bot may have left (and cleared state) during the lookup
+        self._ensure_guild_state_exists(guild_id)
+
+        # Other lookups for this guild may have filled the queue meanwhile
+        try:
+            self.governor.check_queue_length(self.queues[guild_id].qsize())
+        except ResourceBusy as e:
+            await ctx.send(f"⏳ {e}")
+            return
+
+        self.loudness.submit(song)
         await self.queues[guild_id].put(song)
 
         if not (vc.is_playing() or vc.is_paused()):
@@ -262,11 +385,41 @@ class Music(commands.Cog):
             return await ctx.send("❌ Nothing is playing.")
 
         if 0 <= volume <= 100:
+            # Kept per guild so the next songs play at the same level
+            self.volumes[ctx.guild.id] = volume / 100
             vc.source.volume = volume / 100
             await ctx.send(f"🔊 Volume set to **{volume}%**")
         else:
             await ctx.send("❌ Please enter a number between 0 and 100.")
 
+    @commands.command(name="status", aliases=["load"])
+    async def status(self, ctx):
+        """
+        Shows how busy the bot currently is.
+        No inputs required.
+        """
+        stats = self.governor.stats()
+        embed = discord.Embed(title="📊 Bot Load", color=discord.Color.teal())
+        embed.add_field(
+            name="Voice Sessions",
+            value=f"{stats['streams']}/{stats['max_streams']}",
+        )
+        embed.add_field(
+            name="Song Lookups",
+            value=f"{stats['extractions']}/{stats['max_extractions']}",
+        )
+        embed.add_field(
+            name="Waiting Lookups",
+            value=(
+                f"{stats['extraction_backlog']}/{stats['max_extraction_backlog']} "
+                f"({stats['guilds_waiting']} servers)"
+            ),
+        )
+        if self.audio_workers:
+            counts = ", ".join(str(c) for c in self.audio_workers.stream_counts())
+            embed.add_field(name="Streams per Worker", value=counts, inline=False)
+        await ctx.send(embed=embed)
+
     @commands.command(name="shuffle", aliases=["mix"])
     async def shuffle(self, ctx):
         """
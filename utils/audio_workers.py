@@ -0,0 +1,277 @@
+# utils/audio_workers.py
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import discord
+
+from utils.mixer import MixerSource
+from utils.ytdl import DEFAULT_VOLUME, FFMPEG_EXECUTABLE_PATH, YTDLSource
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Number of worker processes running ffmpeg, volume and Opus encoding.
+# 0 keeps the whole audio pipeline in the bot process.
+AUDIO_WORKER_PROCESSES = int(os.getenv("AUDIO_WORKER_PROCESSES", "0"))
+
+PREFETCH_FRAMES = 50  # Encoded 20ms frames a worker may run ahead (1 second)
+ACK_INTERVAL = 10  # The player acknowledges consumed frames every N reads
+MONITOR_INTERVAL = 5  # Seconds between checks for dead workers
+READ_TIMEOUT = 10  # Seconds the player waits for a packet before giving up
+
+
+class NoWorkersAvailable(RuntimeError):
+    """Raised when every worker process is down (restarts are pending)."""
+
+
+# --- Worker Process Side ---
+class _WorkerStream(threading.Thread):
+    """
+    Reads PCM from ffmpeg, applies volume and sends Opus packets back to the
+    bot process. Runs as a thread inside a worker process.
+    """
+
+    def __init__(self, stream_id, url, options, volume, conn):
+        super().__init__(name=f"audio-stream-{stream_id}", daemon=True)
+        self.conn = conn
+        self.source = MixerSource(
+            discord.FFmpegPCMAudio(url, executable=FFMPEG_EXECUTABLE_PATH, **options),
+            volume=volume,
+        )
+        self.encoder = discord.opus.Encoder()
+        self.stopped = threading.Event()
+
+    def run(self):
+        sent = acked = 0
+        try:
+            while not self.stopped.is_set():
+                # Flow control: never run more than PREFETCH_FRAMES ahead
+                while self.conn.poll() or sent - acked >= PREFETCH_FRAMES:
+                    acked = self.conn.recv()
+
+                pcm = self.source.read()
+                if not pcm:
+                    break
+                packet = self.encoder.encode(pcm, self.encoder.SAMPLES_PER_FRAME)
+                self.conn.send_bytes(packet)
+                sent += 1
+
+            self.conn.send_bytes(b"")  # End of stream
+        except (EOFError, OSError):
+            pass  # The player closed its end (skip/stop)
+        finally:
+            self.source.cleanup()
+            self.conn.close()
+
+
+def _worker_main(control_conn):
+    """Entry point of a worker process. Serves commands until shutdown."""
+    streams = {}
+    while True:
+        try:
+            command, stream_id, *args = control_conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if command == "open":
+            try:
+                stream = _WorkerStream(stream_id, *args)
+            except Exception as e:
+                logger.error(f"Could not open stream {stream_id}: {e}")
+                args[-1].close()
+                continue
+            streams[stream_id] = stream
+            stream.start()
+        elif command == "volume":
+            stream = streams.get(stream_id)
+            if stream:
+                stream.source.volume = args[0]
+        elif command == "close":
+            stream = streams.pop(stream_id, None)
+            if stream:
+                stream.stopped.set()
+        elif command == "shutdown":
+            break
+
+    for stream in streams.values():
+        stream.stopped.set()
+
+
+# --- Bot Process Side ---
+class WorkerAudioSource(discord.AudioSource):
+    """
+    Audio source fed with already encoded Opus packets from a worker process.
+    discord.py only has to pace and send them.
+    """
+
+    def __init__(self, pool, worker, stream_id, conn, volume):
+        self._pool = pool
+        self._worker = worker
+        self._stream_id = stream_id
+        self._conn = conn
+        self._volume = volume
+        self._frames = 0
+        self._closed = False
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = max(value, 0.0)
+        self._worker.send(("volume", self._stream_id, self._volume))
+
+    def is_opus(self):
+        return True
+
+    def read(self):
+        try:
+            # A stuck or dead worker must not block the player thread forever
+            if not self._conn.poll(READ_TIMEOUT):
+                logger.warning(f"Stream {self._stream_id} timed out, stopping it.")
+                return b""
+            packet = self._conn.recv_bytes()
+            self._frames += 1
+            if self._frames % ACK_INTERVAL == 0:
+                self._conn.send(self._frames)
+        except (EOFError, OSError):
+            return b""
+        return packet
+
+    def cleanup(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._conn.close()
+        self._pool._release(self._worker, self._stream_id)
+
+
+class _WorkerHandle:
+    def __init__(self, index, context):
+        self.index = index
+        self.streams = 0
+        self._lock = threading.Lock()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"audio-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, message):
+        """Sends a command to the worker. Returns False if it is unreachable."""
+        # Commands come from the event loop and from player threads
+        with self._lock:
+            try:
+                self.conn.send(message)
+                return True
+            except (BrokenPipeError, OSError) as e:
+                logger.error(f"Audio worker {self.index} unreachable: {e}")
+                return False
+
+    def stop(self):
+        self.send(("shutdown", None))
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class AudioWorkerPool:
+    """
+    Pool of processes that run the per-guild audio pipeline (ffmpeg reading,
+    volume and Opus encoding). New streams go to the least loaded worker.
+    """
+
+    def __init__(self, processes=AUDIO_WORKER_PROCESSES):
+        self.processes = processes
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stream_ids = itertools.count()
+        self._wake_monitor = threading.Event()
+        self._stopping = threading.Event()
+        self._monitor = None
+
+    def start(self):
+        for i in range(self.processes):
+            self._workers.append(_WorkerHandle(i, self._context))
+        self._monitor = threading.Thread(
+            target=self._monitor_workers, name="audio-worker-monitor", daemon=True
+        )
+        self._monitor.start()
+        logger.info(f"Started {self.processes} audio worker processes.")
+
+    def shutdown(self):
+        self._stopping.set()
+        self._wake_monitor.set()
+        if self._monitor:
+            self._monitor.join()
+        for worker in self._workers:
+            worker.stop()
+        self._workers.clear()
+
+    def _monitor_workers(self):
+        """Restarts dead workers. Spawning is slow, so it never happens inline."""
+        while not self._stopping.is_set():
+            self._wake_monitor.wait(MONITOR_INTERVAL)
+            self._wake_monitor.clear()
+
+            for i, worker in enumerate(list(self._workers)):
+                if self._stopping.is_set():
+                    return
+                if worker.process.is_alive():
+                    continue
+                logger.warning(f"Audio worker {i} died, restarting it.")
+                replacement = _WorkerHandle(i, self._context)
+                with self._lock:
+                    self._workers[i] = replacement
+
+    def stream_counts(self):
+        return [worker.streams for worker in self._workers]
+
+    def _pick_worker(self):
+        with self._lock:
+            alive = [w for w in self._workers if w.process.is_alive()]
+            if len(alive) < len(self._workers):
+                self._wake_monitor.set()
+            if not alive:
+                raise NoWorkersAvailable("No audio worker process is running.")
+
+            worker = min(alive, key=lambda w: w.streams)
+            worker.streams += 1
+            return worker
+
+    def _release(self, worker, stream_id):
+        worker.send(("close", stream_id))
+        with self._lock:
+            worker.streams = max(worker.streams - 1, 0)
+
+    def create_source(self, url, gain_db=None, volume=DEFAULT_VOLUME):
+        """Starts a stream on the least loaded worker and returns its source."""
+        worker = self._pick_worker()
+        stream_id = next(self._stream_ids)
+        conn, worker_conn = self._context.Pipe()
+
+        options = YTDLSource.ffmpeg_options(gain_db)
+        opened = worker.send(("open", stream_id, url, options, volume, worker_conn))
+        worker_conn.close()
+        if not opened:
+            # The worker died after _pick_worker; our end would never see EOF
+            conn.close()
+            with self._lock:
+                worker.streams = max(worker.streams - 1, 0)
+            self._wake_monitor.set()
+            raise NoWorkersAvailable(f"Audio worker {worker.index} is unreachable.")
+
+        logger.info(
+            f"Stream {stream_id} on audio worker {worker.index} "
+            f"(load: {self.stream_counts()})"
+        )
+        return WorkerAudioSource(self, worker, stream_id, conn, volume)
@@ -0,0 +1,149 @@
+# utils/governor.py
+import asyncio
+import collections
+import contextlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Voice sessions. Each runs one ffmpeg, or two briefly while crossfading.
+MAX_STREAMS = int(os.getenv("MAX_STREAMS", "50"))
+MAX_EXTRACTIONS = int(os.getenv("MAX_EXTRACTIONS", "4"))  # Concurrent yt-dlp lookups
+MAX_EXTRACTION_BACKLOG = int(os.getenv("MAX_EXTRACTION_BACKLOG", "32"))
+MAX_GUILD_EXTRACTION_BACKLOG = int(os.getenv("MAX_GUILD_EXTRACTION_BACKLOG", "3"))
+MAX_QUEUE_LENGTH = int(os.getenv("MAX_QUEUE_LENGTH", "100"))  # Songs per guild
+
+
+class ResourceBusy(Exception):
+    """Raised when a request is turned away because the host is saturated."""
+
+
+class ResourceGovernor:
+    """
+    Admission control for the resources every guild shares: voice sessions,
+    yt-dlp extractions and queue space. Extraction slots are handed out
+    round-robin across guilds so one busy server cannot starve the rest.
+
+    Stream slots count voice sessions, not ffmpeg processes: with crossfades
+    enabled a session runs a second ffmpeg for PRELOAD_SECONDS plus
+    CROSSFADE_SECONDS around each song change, so size MAX_STREAMS with that
+    headroom in mind.
+    """
+
+    def __init__(
+        self,
+        max_streams=MAX_STREAMS,
+        max_extractions=MAX_EXTRACTIONS,
+        max_extraction_backlog=MAX_EXTRACTION_BACKLOG,
+        max_guild_extraction_backlog=MAX_GUILD_EXTRACTION_BACKLOG,
+        max_queue_length=MAX_QUEUE_LENGTH,
+    ):
+        self.max_streams = max_streams
+        self.max_extractions = max_extractions
+        self.max_extraction_backlog = max_extraction_backlog
+        self.max_guild_extraction_backlog = max_guild_extraction_backlog
+        self.max_queue_length = max_queue_length
+
+        self._streams = set()
+        self._active_extractions = 0
+        self._waiting = 0
+        # guild_id -> deque of futures, in round-robin order
+        self._waiters = collections.OrderedDict()
+
+    # --- Streams ---
+    def acquire_stream(self, guild_id):
+        """Reserves a voice session slot for the guild (idempotent)."""
+        if guild_id in self._streams:
+            return
+        if len(self._streams) >= self.max_streams:
+            logger.warning(f"Stream limit reached, rejecting guild {guild_id}")
+            raise ResourceBusy(
+                "The bot is playing in too many servers right now. "
+                "Please try again in a few minutes."
+            )
+        self._streams.add(guild_id)
+
+    def release_stream(self, guild_id):
+        self._streams.discard(guild_id)
+
+    # --- Queues ---
+    def check_queue_length(self, length):
+        if length >= self.max_queue_length:
+            raise ResourceBusy(
+                f"The queue is full ({self.max_queue_length} songs). "
+                "Wait for some songs to finish first."
+            )
+
+    # --- Extractions ---
+    @contextlib.asynccontextmanager
+    async def extraction(self, guild_id):
+        """Holds one extraction slot for the duration of the block."""
+        await self._acquire_extraction(guild_id)
+        try:
+            yield
+        finally:
+            self._release_extraction()
+
+    async def _acquire_extraction(self, guild_id):
+        if self._active_extractions < self.max_extractions and not self._waiters:
+            self._active_extractions += 1
+            return
+
+        guild_waiters = self._waiters.get(guild_id, ())
+        if (
+            self._waiting >= self.max_extraction_backlog
+            or len(guild_waiters) >= self.max_guild_extraction_backlog
+        ):
+            logger.warning(f"Extraction backlog full, rejecting guild {guild_id}")
+            raise ResourceBusy(
+                "Too many songs are being looked up right now. "
+                "Please try again in a moment."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(guild_id, collections.deque()).append(future)
+        self._waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before we were cancelled
+                self._release_extraction()
+            else:
+                self._remove_waiter(guild_id, future)
+            raise
+
+    def _remove_waiter(self, guild_id, future):
+        waiters = self._waiters.get(guild_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self._waiting -= 1
+            if not waiters:
+                del self._waiters[guild_id]
+
+    def _release_extraction(self):
+        # Hand the slot straight to the next guild in round-robin order
+        while self._waiters:
+            guild_id, waiters = self._waiters.popitem(last=False)
+            future = waiters.popleft()
+            self._waiting -= 1
+            if waiters:
+                self._waiters[guild_id] = waiters
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active_extractions -= 1
+
+    # --- Utilization ---
+    def stats(self):
+        return {
+            "streams": len(self._streams),
+            "max_streams": self.max_streams,
+            "extractions": self._active_extractions,
+            "max_extractions": self.max_extractions,
+            "extraction_backlog": self._waiting,
+            "max_extraction_backlog": self.max_extraction_backlog,
+            "guilds_waiting": len(self._waiters),
+        }
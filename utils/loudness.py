@@ -0,0 +1,207 @@
+# utils/loudness.py
+import asyncio
+import json
+import logging
+import os
+import pathlib
+
+from utils.ytdl import FFMPEG_EXECUTABLE_PATH, FFMPEG_OPTIONS, project_root
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+LOUDNESS_INDEX_PATH = project_root / "loudness_index.json"
+
+TARGET_LUFS = -14.0  # Integrated loudness every track is normalized towards
+TRUE_PEAK_CEILING = -1.0  # Never boost a track past this true peak (dBTP)
+MAX_BOOST_DB = 10.0
+MAX_CUT_DB = 20.0
+
+SAMPLE_SECONDS = 60  # Length of the segment measured from remote streams
+ANALYSIS_WORKERS = 1  # Concurrent ffmpeg analysis processes
+ANALYSIS_BACKLOG = 100  # Tracks waiting for analysis before new ones are dropped
+MAX_INDEX_ENTRIES = 50000  # Oldest measurements are dropped beyond this
+SAVE_INTERVAL = 60  # Seconds between writes of new measurements to disk
+
+
+class LoudnessIndex:
+    """
+    Persistent map of video ID -> measured loudness, stored as JSON.
+    """
+
+    def __init__(self, path=LOUDNESS_INDEX_PATH):
+        self.path = pathlib.Path(path)
+        self._entries = {}
+        self.dirty = False
+
+    def load(self):
+        """Reads the index from disk. Blocking, run it off the event loop."""
+        if not self.path.is_file():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            logger.info(f"Loaded loudness data for {len(self._entries)} tracks.")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read loudness index, starting empty: {e}")
+            self._entries = {}
+
+    def snapshot(self):
+        """Returns a copy of the entries to write, and marks the index clean."""
+        self.dirty = False
+        return dict(self._entries)
+
+    def save(self, entries=None):
+        """Writes the index to disk. Blocking, run it off the event loop."""
+        if entries is None:
+            entries = self.snapshot()
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Could not write loudness index: {e}")
+
+    def __contains__(self, video_id):
+        return video_id in self._entries
+
+    def set(self, video_id, integrated, true_peak):
+        self._entries[video_id] = {"integrated": integrated, "true_peak": true_peak}
+        while len(self._entries) > MAX_INDEX_ENTRIES:
+            del self._entries[next(iter(self._entries))]
+        self.dirty = True
+
+    def get_gain(self, video_id):
+        """
+        Returns the gain in dB that brings the track to TARGET_LUFS,
+        or None if the track has not been analyzed yet.
+        """
+        entry = self._entries.get(video_id) if video_id else None
+        if not entry:
+            return None
+
+        gain = TARGET_LUFS - entry["integrated"]
+        if gain > 0:
+            # Don't push the loudest peaks into clipping when boosting
+            gain = min(gain, max(0.0, TRUE_PEAK_CEILING - entry["true_peak"]))
+        return max(-MAX_CUT_DB, min(MAX_BOOST_DB, gain))
+
+
+class LoudnessAnalyzer:
+    """
+    Background stage that measures each track's integrated loudness once
+    with ffmpeg's loudnorm filter and records it in a LoudnessIndex.
+    """
+
+    def __init__(self, index=None):
+        self.index = index or LoudnessIndex()
+        self._queue = asyncio.Queue(maxsize=ANALYSIS_BACKLOG)
+        self._pending = set()
+        self._workers = []
+
+    async def start(self):
+        await asyncio.to_thread(self.index.load)
+        for _ in range(ANALYSIS_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker()))
+        self._workers.append(asyncio.create_task(self._saver()))
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        await self._flush()
+
+    async def _flush(self):
+        if self.index.dirty:
+            await asyncio.to_thread(self.index.save, self.index.snapshot())
+
+    async def _saver(self):
+        # Batch new measurements into one write per interval
+        while True:
+            await asyncio.sleep(SAVE_INTERVAL)
+            await self._flush()
+
+    def get_gain(self, video_id):
+        return self.index.get_gain(video_id)
+
+    def submit(self, song):
+        """Schedules a song for analysis unless it is already known or queued."""
+        video_id = song.get("id")
+        if not video_id or video_id in self.index or video_id in self._pending:
+            return
+
+        try:
+            self._queue.put_nowait(song)
+            self._pending.add(video_id)
+        except asyncio.QueueFull:
+            logger.debug(f"Loudness backlog full, skipping {video_id}")
+
+    async def _worker(self):
+        while True:
+            song = await self._queue.get()
+            try:
+                result = await self._measure(song["source"], song.get("duration"))
+                if result:
+                    self.index.set(song["id"], *result)
+                    logger.info(
+                        f"Measured {song['title']}: {result[0]:.1f} LUFS, "
+                        f"{result[1]:.1f} dBTP"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Loudness analysis error: {e}")
+            finally:
+                self._pending.discard(song.get("id"))
+                self._queue.task_done()
+
+    @staticmethod
+    async def _measure(source, duration=None):
+        """
+        Runs a loudnorm measurement pass and returns (integrated, true_peak).
+        Local files are measured in full, streams only on a sampled segment.
+        """
+        args = [FFMPEG_EXECUTABLE_PATH, "-hide_banner", "-nostats"]
+        if os.path.isfile(source):
+            args += ["-i", source]
+        else:
+            args += FFMPEG_OPTIONS["before_options"].split()
+            if duration and duration > SAMPLE_SECONDS * 2:
+                # Sample from the middle, skipping quiet intros and outros
+                args += ["-ss", str(int((duration - SAMPLE_SECONDS) / 2))]
+            args += ["-t", str(SAMPLE_SECONDS), "-i", source]
+        args += [
+            "-vn",
+            "-af",
+            f"loudnorm=I={TARGET_LUFS}:TP={TRUE_PEAK_CEILING}:print_format=json",
+            "-f",
+            "null",
+            "-",
+        ]
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+
+        # loudnorm prints its JSON summary as the last block on stderr
+        output = stderr.decode("utf-8", errors="ignore")
+        start, end = output.rfind("{"), output.rfind("}")
+        if process.returncode != 0 or start == -1 or end < start:
+            logger.warning(f"ffmpeg loudness pass failed (code {process.returncode})")
+            return None
+
+        stats = json.loads(output[start : end + 1])
+        integrated = float(stats["input_i"])
+        true_peak = float(stats["input_tp"])
+        if integrated == float("-inf"):
+            return None  # Pure silence, nothing to normalize
+        return integrated, true_peak
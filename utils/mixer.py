@@ -0,0 +1,284 @@
+# utils/mixer.py
+import logging
+import os
+import threading
+import numpy as np
+import discord
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+CROSSFADE_SECONDS = float(os.getenv("CROSSFADE_SECONDS", "0"))  # 0 = hard switch
+VOLUME_RAMP_SECONDS = 0.1  # Volume changes glide over this time instead of jumping
+PRELOAD_SECONDS = 3  # Start the next track's ffmpeg this long before crossfading
+
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE  # Bytes per 20ms frame
+FRAME_LENGTH = discord.opus.Encoder.FRAME_LENGTH / 1000  # Seconds per frame
+SAMPLES = FRAME_SIZE // 2  # Interleaved int16 samples per frame
+CHANNELS = discord.opus.Encoder.CHANNELS
+
+
+def _seconds_to_frames(seconds):
+    return int(seconds / FRAME_LENGTH) if seconds else None
+
+
+class _Preload(threading.Thread):
+    """
+    Opens the next track off the audio thread and waits for its first frame,
+    so the crossfade never blocks on ffmpeg connecting to the stream.
+    """
+
+    def __init__(self, song, open_track):
+        super().__init__(name="mixer-preload", daemon=True)
+        self.song = song
+        self.source = None
+        self.first_frame = b""
+        self._open_track = open_track
+        self._lock = threading.Lock()
+        self._discarded = False
+        self.start()
+
+    def run(self):
+        try:
+            source = self._open_track(self.song)
+            first_frame = source.read()
+        except Exception as e:
+            logger.error(f"Could not preload next track: {e}")
+            return
+
+        with self._lock:
+            if self._discarded:
+                source.cleanup()
+                return
+            self.source = source
+            self.first_frame = first_frame
+
+    def ready(self):
+        return len(self.first_frame) == FRAME_SIZE
+
+    def discard(self):
+        with self._lock:
+            self._discarded = True
+            source, self.source = self.source, None
+        if source:
+            source.cleanup()
+
+
+class MixerSource(discord.AudioSource):
+    """
+    PCM source that applies volume, fades and crossfades as vectorized NumPy
+    operations on buffers allocated once per source.
+
+    Crossfading needs to look ahead in the guild's queue, which is done through
+    three callbacks supplied by the player:
+      * peek_next()     -> the song that would play next, without dequeuing it
+      * advance(song)   -> dequeues song if it is still next, returns success
+      * open_track(song) -> a raw PCM AudioSource for the song
+
+    The next track is opened on a helper thread ahead of time. If it is not
+    ready, or the queue changed, the mixer skips the crossfade and the player
+    switches tracks the normal way.
+    """
+
+    def __init__(
+        self,
+        source,
+        volume=1.0,
+        duration=None,
+        crossfade=0.0,
+        peek_next=None,
+        advance=None,
+        open_track=None,
+    ):
+        self._current = source
+        self._frames_left = _seconds_to_frames(duration)
+        self._volume = max(volume, 0.0)
+        self._level = self._volume  # Gain applied at the end of the last frame
+        self._ramp_step = 0.0
+
+        self._crossfade_frames = _seconds_to_frames(crossfade) or 0
+        self._peek_next = peek_next
+        self._advance = advance
+        self._open_track = open_track
+        self._peeked = False
+        self._preloaded = None  # _Preload waiting for the crossfade
+        self._incoming = None
+        self._incoming_first = b""
+        self._incoming_frames = None
+        self._fade_pos = 0
+        self._fade_total = 0
+
+        # Per-sample position within a frame (0..1), shared by every ramp
+        self._ramp = np.repeat(
+            np.arange(SAMPLES // CHANNELS, dtype=np.float32) / (SAMPLES // CHANNELS),
+            CHANNELS,
+        )
+        self._mix = np.empty(SAMPLES, dtype=np.float32)
+        self._work = np.empty(SAMPLES, dtype=np.float32)
+        self._gain = np.empty(SAMPLES, dtype=np.float32)
+        self._out = np.empty(SAMPLES, dtype=np.int16)
+
+    # --- Volume ---
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self.fade_to(value, VOLUME_RAMP_SECONDS)
+
+    def fade_to(self, volume, seconds):
+        """Glides the volume linearly to the given level."""
+        volume = max(volume, 0.0)
+        frames = max(_seconds_to_frames(seconds) or 1, 1)
+        self._ramp_step = abs(volume - self._level) / frames
+        self._volume = volume
+
+    # --- Crossfade ---
+    def _crossfading(self):
+        return (
+            self._peek_next is not None
+            and self._crossfade_frames > 0
+            and self._frames_left is not None
+        )
+
+    def _prepare_next(self):
+        if self._incoming is not None or not self._crossfading():
+            return
+
+        preload_frames = self._crossfade_frames + _seconds_to_frames(PRELOAD_SECONDS)
+        if not self._peeked and self._frames_left <= preload_frames:
+            self._peeked = True
+            song = self._peek_next()
+            if song:
+                self._preloaded = _Preload(song, self._open_track)
+
+        if (
+            self._preloaded
+            and self._preloaded.ready()
+            and self._frames_left <= self._crossfade_frames
+        ):
+            self._begin_crossfade()
+
+    def _discard_preload(self):
+        if self._preloaded is not None:
+            self._preloaded.discard()
+            self._preloaded = None
+
+    def _begin_crossfade(self):
+        preload = self._preloaded
+        if not preload.ready():
+            return False
+
+        # The queue may have changed since the preload (remove/shuffle/skip),
+        # in which case the player switches tracks the normal way
+        if self._peek_next() is not preload.song or not self._advance(preload.song):
+            self._discard_preload()
+            return False
+
+        self._preloaded = None
+        self._incoming = preload.source
+        self._incoming_first = preload.first_frame
+        self._incoming_frames = _seconds_to_frames(preload.song.get("duration"))
+        self._fade_pos = 0
+        self._fade_total = max(min(self._crossfade_frames, self._frames_left), 1)
+        return True
+
+    def _promote(self):
+        """Makes the incoming track the current one. Returns False if there is none."""
+        if self._incoming is None:
+            if not (self._preloaded and self._begin_crossfade()):
+                return False
+
+        self._current.cleanup()
+        self._current = self._incoming
+        self._frames_left = self._incoming_frames
+        self._incoming = None
+        self._peeked = False
+        return True
+
+    # --- Mixing ---
+    def _fill_ramp(self, start, end):
+        # self._gain = start + (end - start) * position, without temporaries
+        np.multiply(self._ramp, end - start, out=self._gain)
+        self._gain += start
+
+    def _scale(self, pcm, level):
+        """Fast path for the common case: constant volume, no crossfade."""
+        if level == 1.0:
+            return pcm
+        # One multiply straight from the int16 view and one cast back
+        np.multiply(
+            np.frombuffer(pcm, dtype=np.int16), np.float32(level), out=self._mix
+        )
+        if level > 1.0:
+            np.clip(self._mix, -32768, 32767, out=self._mix)
+        np.copyto(self._out, self._mix, casting="unsafe")
+        return self._out.tobytes()
+
+    def read(self):
+        self._prepare_next()
+
+        pcm = self._current.read()
+        if len(pcm) != FRAME_SIZE:
+            if not self._promote():
+                return b""
+            pcm = self._incoming_first or self._current.read()
+            self._incoming_first = b""
+            if len(pcm) != FRAME_SIZE:
+                return b""
+
+        if self._frames_left is not None:
+            self._frames_left -= 1
+
+        level = self._level
+        if self._incoming is None and level == self._volume:
+            return self._scale(pcm, level)
+
+        mix = self._mix
+        mix[:] = np.frombuffer(pcm, dtype=np.int16)
+
+        if self._incoming is not None:
+            # Equal-power crossfade: cos() for the outgoing, sin() for the incoming
+            quarter = np.pi / 2 / self._fade_total
+            self._fill_ramp(self._fade_pos * quarter, (self._fade_pos + 1) * quarter)
+            self._work[:] = self._gain
+            np.cos(self._work, out=self._gain)
+            mix *= self._gain
+            np.sin(self._work, out=self._gain)
+
+            incoming = self._incoming_first or self._incoming.read()
+            self._incoming_first = b""
+            if len(incoming) == FRAME_SIZE:
+                self._work[:] = np.frombuffer(incoming, dtype=np.int16)
+                self._work *= self._gain
+                mix += self._work
+            if self._incoming_frames is not None:
+                self._incoming_frames -= 1
+
+            self._fade_pos += 1
+            if self._fade_pos >= self._fade_total:
+                self._promote()
+
+        # Volume, ramped across the frame while it is changing
+        start, target = self._level, self._volume
+        if start != target:
+            remaining = abs(target - start)
+            step = min(self._ramp_step, remaining) or remaining
+            end = start + step if target > start else start - step
+            self._fill_ramp(start, end)
+            mix *= self._gain
+            self._level = end
+        elif start != 1.0:
+            mix *= np.float32(start)
+
+        np.clip(mix, -32768, 32767, out=mix)
+        np.copyto(self._out, mix, casting="unsafe")
+        return self._out.tobytes()
+
+    def cleanup(self):
+        self._current.cleanup()
+        if self._incoming is not None:
+            self._incoming.cleanup()
+            self._incoming = None
+        self._discard_preload()
@@ -5,6 +5,7 @@ import logging
 import pathlib
 import platform
 import discord
+from utils.mixer import MixerSource
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,8 @@ FFMPEG_OPTIONS = {
     "options": "-vn",
 }
 
+DEFAULT_VOLUME = 0.5
+
 
 class YTDLSource:
     @staticmethod
@@ -103,6 +106,7 @@ class YTDLSource:
                 return None
 
             return {
+                "id": data.get("id"),
                 "source": data["url"],
                 "title": data.get("title", "Unknown Title"),
                 "webpage_url": data.get("webpage_url", ""),
@@ -115,10 +119,26 @@ class YTDLSource:
             return None
 
     @staticmethod
-    def create_source(url):
-        """Creates the FFmpeg audio source with volume control."""
-        source = discord.FFmpegPCMAudio(
-            url, executable=FFMPEG_EXECUTABLE_PATH, **FFMPEG_OPTIONS
+    def ffmpeg_options(gain_db=None):
+        """
+        Returns the FFmpeg options, applying a precomputed loudness gain
+        inside the ffmpeg process so it costs nothing extra in Python.
+        """
+        options = dict(FFMPEG_OPTIONS)
+        if gain_db is not None:
+            options["options"] += f' -af "volume={gain_db:.2f}dB"'
+        return options
+
+    @classmethod
+    def create_pcm_source(cls, url, gain_db=None):
+        """Creates the raw FFmpeg PCM source, without volume control."""
+        return discord.FFmpegPCMAudio(
+            url, executable=FFMPEG_EXECUTABLE_PATH, **cls.ffmpeg_options(gain_db)
         )
-        # Wrap in PCMVolumeTransformer to enable volume changing
-        return discord.PCMVolumeTransformer(source, volume=0.5)
+
+    @classmethod
+    def create_source(cls, url, gain_db=None, volume=DEFAULT_VOLUME, **mixer_options):
+        """Creates the FFmpeg audio source with volume control."""
+        source = cls.create_pcm_source(url, gain_db)
+        # Wrap in the mixer for smooth volume changes and crossfades
+        return MixerSource(source, volume=volume, **mixer_options)